@@ -0,0 +1,135 @@
+import asyncio
+from types import TracebackType
+from typing import Any, AsyncGenerator, Iterable, List, Optional, Sequence
+
+from .interfaces import (
+    BackendABC,
+    ConnectionABC,
+    LiteralString,
+    RecordType,
+    TransactionABC,
+    ValueType,
+)
+
+
+class LazyTransaction(TransactionABC):
+    __slots__ = ("_connection", "_force_rollback", "_transaction")
+
+    def __init__(self, connection: "LazyConnection", *, force_rollback: bool = False) -> None:
+        self._connection = connection
+        self._force_rollback = force_rollback
+        self._transaction: Optional[TransactionABC] = None
+
+    async def __aenter__(self) -> "LazyTransaction":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type: type, exc_value: BaseException, tb: TracebackType) -> None:
+        if self._force_rollback or exc_type is not None:
+            await self.rollback()
+        else:
+            await self.commit()
+
+    async def start(self) -> None:
+        connection = await self._connection._acquire()
+        self._transaction = connection.transaction(force_rollback=self._force_rollback)
+        await self._transaction.start()
+
+    async def commit(self) -> None:
+        await self._transaction.commit()
+        self._transaction = None
+
+    async def rollback(self) -> None:
+        await self._transaction.rollback()
+        self._transaction = None
+
+
+class LazyConnection(ConnectionABC):
+    """A connection that is acquired from the backend on first use.
+
+    This allows requests that do not use the database to avoid holding
+    a connection from the pool.
+    """
+
+    __slots__ = ("_backend", "_connection", "_lock")
+
+    def __init__(self, backend: BackendABC) -> None:
+        self._backend = backend
+        self._connection: Optional[ConnectionABC] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def supports_for_update(self) -> bool:
+        if self._connection is None:
+            return self._backend.supports_for_update
+        return self._connection.supports_for_update
+
+    async def execute(self, query: LiteralString, values: Optional[ValueType] = None) -> None:
+        connection = await self._acquire()
+        await connection.execute(query, values)
+
+    async def execute_many(self, query: LiteralString, values: List[ValueType]) -> None:
+        connection = await self._acquire()
+        await connection.execute_many(query, values)
+
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        *,
+        records: Iterable[Sequence[Any]],
+        columns: Optional[Sequence[str]] = None,
+        schema_name: Optional[str] = None,
+    ) -> None:
+        connection = await self._acquire()
+        await connection.copy_records_to_table(
+            table_name, records=records, columns=columns, schema_name=schema_name
+        )
+
+    async def fetch_all(
+        self,
+        query: LiteralString,
+        values: Optional[ValueType] = None,
+    ) -> List[RecordType]:
+        connection = await self._acquire()
+        return await connection.fetch_all(query, values)
+
+    async def fetch_one(
+        self,
+        query: LiteralString,
+        values: Optional[ValueType] = None,
+    ) -> Optional[RecordType]:
+        connection = await self._acquire()
+        return await connection.fetch_one(query, values)
+
+    async def fetch_val(
+        self,
+        query: LiteralString,
+        values: Optional[ValueType] = None,
+    ) -> Optional[Any]:
+        connection = await self._acquire()
+        return await connection.fetch_val(query, values)
+
+    async def iterate(
+        self,
+        query: LiteralString,
+        values: Optional[ValueType] = None,
+    ) -> AsyncGenerator[RecordType, None]:
+        connection = await self._acquire()
+        async for record in connection.iterate(query, values):
+            yield record
+
+    def transaction(self, *, force_rollback: bool = False) -> LazyTransaction:
+        return LazyTransaction(self, force_rollback=force_rollback)
+
+    async def release(self) -> None:
+        if self._connection is not None:
+            connection = self._connection
+            self._connection = None
+            await self._backend.release(connection)
+
+    async def _acquire(self) -> ConnectionABC:
+        if self._connection is None:
+            async with self._lock:
+                if self._connection is None:
+                    self._connection = await self._backend.acquire()
+        return self._connection
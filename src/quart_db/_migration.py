@@ -1,8 +1,9 @@
 import importlib.util
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from types import ModuleType
-from typing import AsyncGenerator, Callable, Literal
+from typing import AsyncGenerator, Callable, FrozenSet, Literal
 
 from .interfaces import BackendABC, ConnectionABC
 
@@ -17,23 +18,37 @@ async def null_context() -> AsyncGenerator[None, None]:
 
 
 async def execute_foreground_migrations(
-    backend: BackendABC,
+    connection: ConnectionABC,
     migrations_path: Path,
     state_table_name: str,
+    single_transaction: bool = False,
 ) -> None:
-    connection = await backend._acquire_migration_connection()
-    try:
-        async for module in _migration_generator(
-            connection, "foreground", migrations_path, state_table_name, connection.transaction
-        ):
-            await module.migrate(connection)
-            valid = not hasattr(module, "valid_migration") or await module.valid_migration(
-                connection
+    if single_transaction:
+        # All the supported databases have transactional DDL, so a
+        # single transaction can cover every foreground migration
+        async with connection.transaction():
+            await _run_foreground_migrations(
+                connection, migrations_path, state_table_name, null_context
             )
-            if not valid:
-                raise MigrationFailedError(f"Migration {module.__name__} is not valid")
-    finally:
-        await backend._release_migration_connection(connection)
+    else:
+        await _run_foreground_migrations(
+            connection, migrations_path, state_table_name, connection.transaction
+        )
+
+
+async def _run_foreground_migrations(
+    connection: ConnectionABC,
+    migrations_path: Path,
+    state_table_name: str,
+    context: Callable[..., AbstractAsyncContextManager],
+) -> None:
+    async for module in _migration_generator(
+        connection, "foreground", migrations_path, state_table_name, context
+    ):
+        await module.migrate(connection)
+        valid = not hasattr(module, "valid_migration") or await module.valid_migration(connection)
+        if not valid:
+            raise MigrationFailedError(f"Migration {module.__name__} is not valid")
 
 
 async def execute_background_migrations(
@@ -54,28 +69,24 @@ async def execute_background_migrations(
 
 
 async def execute_data_loader(
-    backend: BackendABC,
+    connection: ConnectionABC,
     data_path: Path,
     state_table_name: str,
 ) -> None:
-    connection = await backend._acquire_migration_connection()
-    try:
-        for_update = "FOR UPDATE" if connection.supports_for_update else ""
+    for_update = "FOR UPDATE" if connection.supports_for_update else ""
 
-        async with connection.transaction():
-            data_loaded = await connection.fetch_val(
-                f"SELECT data_loaded FROM {state_table_name} {for_update}"
-            )
-            if not data_loaded:
-                module = _load_module("quart_db_data", data_path)
-                try:
-                    await module.execute(connection)
-                except Exception:
-                    raise MigrationFailedError("Error loading data")
-                else:
-                    await connection.execute(f"UPDATE {state_table_name} SET data_loaded = TRUE")
-    finally:
-        await backend._release_migration_connection(connection)
+    async with connection.transaction():
+        data_loaded = await connection.fetch_val(
+            f"SELECT data_loaded FROM {state_table_name} {for_update}"
+        )
+        if not data_loaded:
+            module = _load_module("quart_db_data", data_path)
+            try:
+                await module.execute(connection)
+            except Exception:
+                raise MigrationFailedError("Error loading data")
+            else:
+                await connection.execute(f"UPDATE {state_table_name} SET data_loaded = TRUE")
 
 
 def _load_module(name: str, path: Path) -> ModuleType:
@@ -85,6 +96,21 @@ def _load_module(name: str, path: Path) -> ModuleType:
     return module
 
 
+@lru_cache(maxsize=None)
+def _load_migration(migrations_path: Path, migration: int) -> ModuleType:
+    return _load_module(f"quart_db_{migration}", migrations_path / f"{migration}.py")
+
+
+def _migration_numbers(migrations_path: Path) -> FrozenSet[int]:
+    # Only canonical names, e.g. not 01.py, as the migration is loaded
+    # from its number
+    return frozenset(
+        int(path.stem)
+        for path in migrations_path.glob("*.py")
+        if path.stem.isascii() and path.stem.isdigit() and str(int(path.stem)) == path.stem
+    )
+
+
 async def _migration_generator(
     connection: ConnectionABC,
     type_name: Literal["foreground", "background"],
@@ -93,33 +119,41 @@ async def _migration_generator(
     context: Callable[..., AbstractAsyncContextManager],
 ) -> AsyncGenerator[ModuleType, None]:
     for_update = "FOR UPDATE" if connection.supports_for_update else ""
+    select_query = f"SELECT {type_name} FROM {state_table_name} {for_update}"
+    update_query = f"UPDATE {state_table_name} SET {type_name} = :migration"
+    migrations = _migration_numbers(migrations_path)
 
     while True:
         async with context():
-            migration = await connection.fetch_val(
-                f"SELECT {type_name} FROM {state_table_name} {for_update}"
-            )
+            migration = await connection.fetch_val(select_query)
             migration += 1
-            migration_path = migrations_path / f"{migration}.py"
-            try:
-                module = _load_module(f"quart_db_{migration}", migration_path)
-            except FileNotFoundError:
-                if migration > 0 and not (migrations_path / f"{migration - 1}.py").exists():
-                    raise MigrationFailedError("Database is ahead of local migrations") from None
+            if migration not in migrations:
+                if migration > 0 and migration - 1 not in migrations:
+                    raise MigrationFailedError("Database is ahead of local migrations")
                 else:
                     return
 
+            module = _load_migration(migrations_path, migration)
             yield module
 
-            await connection.execute(
-                f"UPDATE {state_table_name} SET {type_name} = :migration",
-                values={"migration": migration},
-            )
+            # Consecutive cheap foreground migrations share a single
+            # state update, whereas background migrations may be
+            # expensive even if the foreground migration is cheap.
+            while (
+                type_name == "foreground"
+                and getattr(module, "cheap", False)
+                and migration + 1 in migrations
+            ):
+                module = _load_migration(migrations_path, migration + 1)
+                if not getattr(module, "cheap", False):
+                    break
+                migration += 1
+                yield module
 
+            await connection.execute(update_query, values={"migration": migration})
 
-async def ensure_state_table(backend: BackendABC, state_table_name: str) -> None:
-    connection = await backend._acquire_migration_connection()
 
+async def ensure_state_table(connection: ConnectionABC, state_table_name: str) -> None:
     # This is required to migrate previous state version tables
     try:
         result = await connection.fetch_one(f"SELECT version, data_loaded FROM {state_table_name}")
@@ -131,22 +165,19 @@ async def ensure_state_table(backend: BackendABC, state_table_name: str) -> None
         data_loaded = result["data_loaded"]
         await connection.execute(f"DROP TABLE {state_table_name}")
 
-    try:
-        await connection.execute(
-            f"""CREATE TABLE IF NOT EXISTS {state_table_name} (
-                   onerow_id BOOL PRIMARY KEY DEFAULT TRUE,
-                   background INTEGER NOT NULL,
-                   data_loaded BOOL NOT NULL,
-                   foreground INTEGER NOT NULL,
-
-                   CONSTRAINT onerow_uni CHECK (onerow_id)
-               )""",
-        )
-        await connection.execute(
-            f"""INSERT INTO {state_table_name} (background, data_loaded, foreground)
-                     VALUES (:version, :data_loaded, :version)
-                ON CONFLICT DO NOTHING""",
-            {"version": version, "data_loaded": data_loaded},
-        )
-    finally:
-        await backend._release_migration_connection(connection)
+    await connection.execute(
+        f"""CREATE TABLE IF NOT EXISTS {state_table_name} (
+               onerow_id BOOL PRIMARY KEY DEFAULT TRUE,
+               background INTEGER NOT NULL,
+               data_loaded BOOL NOT NULL,
+               foreground INTEGER NOT NULL,
+
+               CONSTRAINT onerow_uni CHECK (onerow_id)
+           )""",
+    )
+    await connection.execute(
+        f"""INSERT INTO {state_table_name} (background, data_loaded, foreground)
+                 VALUES (:version, :data_loaded, :version)
+            ON CONFLICT DO NOTHING""",
+        {"version": version, "data_loaded": data_loaded},
+    )
@@ -0,0 +1,76 @@
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Tuple
+
+from buildpg import BuildError, render as _render
+from buildpg.components import Component
+
+
+class _Parameter:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+_Arguments = Callable[[Dict[str, Any]], List[Any]]
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(query: str, names: Tuple[str, ...]) -> Tuple[str, _Arguments]:
+    compiled_query, parameters = _render(query, **{name: _Parameter(name) for name in names})
+    return compiled_query, _arguments_getter(tuple(parameter.name for parameter in parameters))
+
+
+def _arguments_getter(names: Tuple[str, ...]) -> _Arguments:
+    # itemgetter builds the arguments in C, but returns the value
+    # itself rather than a tuple when given a single name.
+    if len(names) == 0:
+        return lambda values: []
+
+    getter = itemgetter(*names)
+    if len(names) == 1:
+        return lambda values: [getter(values)]
+    else:
+        return lambda values: list(getter(values))
+
+
+def render(query: str, values: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Render the query replacing the named binds with positional binds.
+
+    The rendered query and the order of the binds is cached by the
+    query and bind names, so that only the arguments are built per
+    call. Values that are buildpg components alter the query itself
+    and hence are always rendered.
+
+    """
+    if any(isinstance(value, Component) for value in values.values()):
+        return _render(query, **values)
+
+    try:
+        compiled_query, arguments = _compile_template(query, tuple(sorted(values)))
+    except BuildError:
+        # Render with the actual values to raise the correct error
+        return _render(query, **values)
+    else:
+        return compiled_query, arguments(values)
+
+
+def render_many(query: str, values: List[Dict[str, Any]]) -> Tuple[str, List[List[Any]]]:
+    """Render the query once for many sets of values.
+
+    The query is rendered for the first set of values, with the
+    arguments for every set then built from the bind order. If the
+    sets of values differ each is rendered in turn.
+
+    """
+    first = values[0]
+    if not any(isinstance(value, Component) for value in first.values()):
+        try:
+            compiled_query, arguments = _compile_template(query, tuple(sorted(first)))
+            return compiled_query, [arguments(value) for value in values]
+        except (BuildError, KeyError):
+            pass
+
+    compiled_query, args = render(query, first)
+    return compiled_query, [args] + [render(query, value)[1] for value in values[1:]]
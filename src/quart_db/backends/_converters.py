@@ -0,0 +1,15 @@
+from ..interfaces import TypeConverters
+
+
+def merge_type_converters(defaults: TypeConverters, overrides: TypeConverters) -> TypeConverters:
+    """Merge the converters per schema into a new mapping.
+
+    Converters set for a schema override only the defaults with the
+    same typename. The result is a copy, so converters set after the
+    backend is created do not alter it.
+
+    """
+    return {
+        schema: {**defaults.get(schema, {}), **overrides.get(schema, {})}
+        for schema in {*defaults, *overrides}
+    }
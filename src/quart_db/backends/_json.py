@@ -0,0 +1,28 @@
+import json
+from typing import Any, Union
+
+# A single compact encoder, as json.dumps builds a new encoder per call
+# whenever any option is given
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(value: Any) -> str:
+    return _encoder.encode(value)
+
+
+def loads(value: Union[bytes, str]) -> Any:
+    return json.loads(value)
+
+
+# The binary JSONB format is the JSON text prefixed with a version byte
+JSONB_VERSION = b"\x01"
+
+
+def dumps_jsonb(value: Any) -> bytes:
+    return JSONB_VERSION + _encoder.encode(value).encode()
+
+
+def loads_jsonb(value: bytes) -> Any:
+    if value[:1] != JSONB_VERSION:
+        raise ValueError(f"Unsupported JSONB version {value[:1]!r}")
+    return loads(value[1:])
@@ -1,13 +1,24 @@
 import asyncio
-import json
 from sqlite3 import PARSE_DECLTYPES, ProgrammingError
 from types import TracebackType
-from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Type,
+)
 from urllib.parse import urlsplit
-from uuid import uuid4
 
 import aiosqlite
 
+from ._converters import merge_type_converters
+from ._json import dumps, loads
 from ..interfaces import (
     BackendABC,
     ConnectionABC,
@@ -23,14 +34,23 @@ try:
 except ImportError:
     from typing_extensions import LiteralString
 
-DEFAULT_TYPE_CONVERTERS = {
+DEFAULT_TYPE_CONVERTERS: TypeConverters = {
     "": {
-        "json": (json.dumps, json.loads, dict),
+        "json": (dumps, loads, dict),
     },
 }
 
+DEFAULT_PRAGMAS = {
+    "cache_size": -64000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+}
+
 
 class Transaction(TransactionABC):
+    __slots__ = ("_connection", "_force_rollback", "_savepoints")
+
     def __init__(self, connection: "Connection", *, force_rollback: bool = False) -> None:
         self._connection = connection
         self._force_rollback = force_rollback
@@ -47,37 +67,43 @@ class Transaction(TransactionABC):
             await self.commit()
 
     async def start(self) -> None:
-        if self._connection._connection.in_transaction:
-            savepoint_name = f"QUART_DB_SAVEPOINT_{uuid4().hex}"
-            await self._connection._connection.execute(f"SAVEPOINT {savepoint_name}")
-            self._savepoints.append(savepoint_name)
-        else:
-            async with self._connection._lock:
-                await self._connection._connection.execute("BEGIN")
+        connection = self._connection._connection
+        async with self._connection._lock:
+            if connection.in_transaction:
+                self._connection._savepoint_id += 1
+                savepoint_name = f"QUART_DB_SAVEPOINT_{self._connection._savepoint_id}"
+                await connection.execute(f"SAVEPOINT {savepoint_name}")
+                self._savepoints.append(savepoint_name)
+            else:
+                await connection.execute("BEGIN")
 
     async def commit(self) -> None:
-        if len(self._savepoints):
-            savepoint_name = self._savepoints.pop()
-            await self._connection._connection.execute(f"RELEASE SAVEPOINT {savepoint_name}")
-        else:
-            async with self._connection._lock:
+        async with self._connection._lock:
+            if len(self._savepoints):
+                savepoint_name = self._savepoints.pop()
+                await self._connection._connection.execute(f"RELEASE SAVEPOINT {savepoint_name}")
+            else:
                 await self._connection._connection.execute("COMMIT")
 
     async def rollback(self) -> None:
-        if len(self._savepoints):
-            savepoint_name = self._savepoints.pop()
-            await self._connection._connection.execute(f"ROLLBACK TO SAVEPOINT {savepoint_name}")
-        else:
-            async with self._connection._lock:
+        async with self._connection._lock:
+            if len(self._savepoints):
+                savepoint_name = self._savepoints.pop()
+                await self._connection._connection.execute(
+                    f"ROLLBACK TO SAVEPOINT {savepoint_name}"
+                )
+            else:
                 await self._connection._connection.execute("ROLLBACK")
 
 
 class Connection(ConnectionABC):
+    __slots__ = ("_connection", "_lock", "_savepoint_id")
     supports_for_update = False
 
     def __init__(self, connection: aiosqlite.Connection) -> None:
         self._connection = connection
         self._lock = asyncio.Lock()
+        self._savepoint_id = 0
 
     async def execute(self, query: LiteralString, values: Optional[ValueType] = None) -> None:
         try:
@@ -90,11 +116,46 @@ class Connection(ConnectionABC):
         if not values:
             return
 
-        try:
-            async with self._lock:
+        # Outside of a transaction SQLite would commit, and sync, per
+        # row, hence the rows are inserted in a single transaction. The
+        # lock is held throughout so that no other usage of the
+        # connection is included in the transaction.
+        async with self._lock:
+            in_transaction = self._connection.in_transaction
+            if not in_transaction:
+                await self._connection.execute("BEGIN IMMEDIATE")
+            try:
                 await self._connection.executemany(query, values)
-        except ProgrammingError as error:
-            raise UndefinedParameterError(str(error))
+            except BaseException as error:
+                if not in_transaction:
+                    await self._connection.execute("ROLLBACK")
+                if isinstance(error, ProgrammingError):
+                    raise UndefinedParameterError(str(error))
+                raise
+
+            if not in_transaction:
+                await self._connection.execute("COMMIT")
+
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        *,
+        records: Iterable[Sequence[Any]],
+        columns: Optional[Sequence[str]] = None,
+        schema_name: Optional[str] = None,
+    ) -> None:
+        # SQLite has no COPY, instead the records are inserted via a
+        # single executemany in a transaction.
+        schema = "" if schema_name is None else f"{_quote(schema_name)}."
+        if columns is None:
+            rows = await self.fetch_all(f"PRAGMA {schema}table_info({_quote(table_name)})")
+            columns = [row["name"] for row in rows]
+        query = (
+            f"INSERT INTO {schema}{_quote(table_name)} "
+            f"({', '.join(_quote(column) for column in columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        await self.execute_many(query, list(records))  # type: ignore
 
     async def fetch_all(
         self,
@@ -105,10 +166,11 @@ class Connection(ConnectionABC):
             async with self._lock:
                 async with self._connection.execute(query, values) as cursor:
                     rows = await cursor.fetchall()
+                    keys = _column_names(cursor)
         except ProgrammingError as error:
             raise UndefinedParameterError(str(error))
         else:
-            return [{key: row[key] for key in row.keys()} for row in rows]
+            return [dict(zip(keys, row)) for row in rows]
 
     async def fetch_one(
         self,
@@ -119,11 +181,12 @@ class Connection(ConnectionABC):
             async with self._lock:
                 async with self._connection.execute(query, values) as cursor:
                     row = await cursor.fetchone()
+                    keys = _column_names(cursor)
         except ProgrammingError as error:
             raise UndefinedParameterError(str(error))
         else:
             if row is not None:
-                return {key: row[key] for key in row.keys()}
+                return dict(zip(keys, row))
             return None
 
     async def fetch_val(
@@ -148,10 +211,10 @@ class Connection(ConnectionABC):
         values: Optional[ValueType] = None,
     ) -> AsyncGenerator[RecordType, None]:
         try:
-            async with self._lock:
-                async with self._connection.execute(query, values) as cursor:
-                    async for row in cursor:
-                        yield {key: row[key] for key in row.keys()}
+            async with self._connection.execute(query, values) as cursor:
+                keys = _column_names(cursor)
+                async for row in cursor:
+                    yield dict(zip(keys, row))
         except ProgrammingError as error:
             raise UndefinedParameterError(str(error))
 
@@ -159,71 +222,105 @@ class Connection(ConnectionABC):
         return Transaction(self, force_rollback=force_rollback)
 
 
+def _column_names(cursor: aiosqlite.Cursor) -> List[str]:
+    return [column[0] for column in cursor.description or ()]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+async def _connect(path: str, pragmas: Dict[str, Any], **kwargs: Any) -> aiosqlite.Connection:
+    connection = aiosqlite.connect(database=path, isolation_level=None, **kwargs)
+    await connection.__aenter__()
+    if pragmas:
+        await connection.executescript(
+            "".join(f"PRAGMA {name} = {value};" for name, value in pragmas.items())
+        )
+    return connection
+
+
 class Backend(BackendABC):
+    supports_for_update = False
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
         _, _, path, *_ = urlsplit(url)
         self._path = path[1:]
-        self._options = options
+        self._options = {**options}
+        self._pool_size = self._options.pop("pool_size", 5)
+        self._pragmas = {**DEFAULT_PRAGMAS, **self._options.pop("pragmas", {})}
         self._connections: Set[aiosqlite.Connection] = set()
-        for _, converters in {**DEFAULT_TYPE_CONVERTERS, **type_converters}.items():
-            for typename, (encoder, decoder, pytype) in converters.items():  # type: ignore
-                aiosqlite.register_adapter(pytype, encoder)
-                aiosqlite.register_converter(typename, decoder)
+        self._idle: List[aiosqlite.Connection] = []
+        _register_type_converters(merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters))
 
     async def connect(self) -> None:
         pass
 
     async def disconnect(self, timeout: Optional[int] = None) -> None:
-        tasks = [asyncio.ensure_future(connection.close()) for connection in self._connections]
-        await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+        connections = tuple(self._connections)
+        self._connections.clear()
+        self._idle.clear()
+        tasks = [asyncio.create_task(connection.close()) for connection in connections]
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*tasks, return_exceptions=True), timeout
+            )
+        except asyncio.TimeoutError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        # Every connection is closed before any failure is raised
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
     async def acquire(self) -> Connection:
-        connection = aiosqlite.connect(
-            database=self._path,
-            isolation_level=None,
-            detect_types=PARSE_DECLTYPES,
-            **self._options,
+        if self._idle:
+            return Connection(self._idle.pop())
+
+        connection = await _connect(
+            self._path, self._pragmas, detect_types=PARSE_DECLTYPES, **self._options
         )
-        await connection.__aenter__()
-        connection.row_factory = aiosqlite.Row
         self._connections.add(connection)
         return Connection(connection)
 
     async def release(self, connection: Connection) -> None:  # type: ignore[override]
-        await connection._connection.__aexit__(None, None, None)
-        self._connections.remove(connection._connection)
+        raw_connection = connection._connection
+        # Keep the connection (and its page cache) for reuse, unless
+        # it is left in a transaction or the pool is full.
+        if (
+            raw_connection in self._connections
+            and not raw_connection.in_transaction
+            and len(self._idle) < self._pool_size
+        ):
+            self._idle.append(raw_connection)
+        else:
+            await raw_connection.__aexit__(None, None, None)
+            self._connections.discard(raw_connection)
 
     async def _acquire_migration_connection(self) -> Connection:
-        connection = aiosqlite.connect(
-            database=self._path,
-            isolation_level=None,
-        )
-        await connection.__aenter__()
-        connection.row_factory = aiosqlite.Row
-        return Connection(connection)
+        return Connection(await _connect(self._path, self._pragmas))
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
         await connection._connection.__aexit__(None, None, None)
 
 
 class TestingBackend(BackendABC):
+    supports_for_update = False
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
         _, _, path, *_ = urlsplit(url)
         self._path = path[1:]
-        self._options = options
-        for _, converters in {**DEFAULT_TYPE_CONVERTERS, **type_converters}.items():
-            for typename, (encoder, decoder, pytype) in converters.items():  # type: ignore
-                aiosqlite.register_adapter(pytype, encoder)
-                aiosqlite.register_converter(typename, decoder)
+        self._options = {**options}
+        self._pragmas = {**DEFAULT_PRAGMAS, **self._options.pop("pragmas", {})}
+        _register_type_converters(merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters))
 
     async def connect(self) -> None:
-        connection = aiosqlite.connect(
-            database=self._path,
-            isolation_level=None,
-            detect_types=PARSE_DECLTYPES,
-            **self._options,
+        connection = await _connect(
+            self._path, self._pragmas, detect_types=PARSE_DECLTYPES, **self._options
         )
-        await connection.__aenter__()
         self._connection = Connection(connection)
 
     async def disconnect(self, timeout: Optional[int] = None) -> None:
@@ -236,13 +333,24 @@ class TestingBackend(BackendABC):
         pass
 
     async def _acquire_migration_connection(self) -> Connection:
-        connection = aiosqlite.connect(
-            database=self._path,
-            isolation_level=None,
-        )
-        await connection.__aenter__()
-        connection.row_factory = aiosqlite.Row
-        return Connection(connection)
+        return Connection(await _connect(self._path, self._pragmas))
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
         await connection._connection.__aexit__(None, None, None)
+
+
+_adapters: Dict[Type, Callable] = {}
+_converters: Dict[str, Callable] = {}
+
+
+def _register_type_converters(type_converters: TypeConverters) -> None:
+    # The adapters and converters are global to the sqlite3 module,
+    # so only register those that have changed.
+    for converters in type_converters.values():
+        for typename, (encoder, decoder, pytype) in converters.items():
+            if _adapters.get(pytype) is not encoder:
+                aiosqlite.register_adapter(pytype, encoder)
+                _adapters[pytype] = encoder
+            if _converters.get(typename) is not decoder:
+                aiosqlite.register_converter(typename, decoder)
+                _converters[typename] = decoder
@@ -1,11 +1,14 @@
 import asyncio
-import json
 from types import TracebackType
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import asyncpg
-from buildpg import BuildError, render
+from asyncpg.exceptions import UndefinedParameterError as AsyncpgUndefinedParameterError
+from buildpg import BuildError
 
+from ._compile import render, render_many
+from ._converters import merge_type_converters
+from ._json import dumps, dumps_jsonb, loads, loads_jsonb
 from ..interfaces import (
     BackendABC,
     ConnectionABC,
@@ -21,15 +24,20 @@ try:
 except ImportError:
     from typing_extensions import LiteralString
 
-DEFAULT_TYPE_CONVERTERS = {
+DEFAULT_TYPE_CONVERTERS: TypeConverters = {
     "pg_catalog": {
-        "json": (json.dumps, json.loads, None),
-        "jsonb": (json.dumps, json.loads, None),
+        "json": (dumps, loads, None),
+        "jsonb": (dumps, loads, None),
     }
 }
 
+# The number of records fetched per round trip when iterating
+ITERATE_PREFETCH = 1000
+
 
 class Transaction(TransactionABC):
+    __slots__ = ("_connection", "_force_rollback", "_transaction")
+
     def __init__(self, connection: "Connection", *, force_rollback: bool = False) -> None:
         self._connection = connection
         self._transaction: Optional[asyncpg.Transaction] = None
@@ -62,6 +70,7 @@ class Transaction(TransactionABC):
 
 
 class Connection(ConnectionABC):
+    __slots__ = ("_connection", "_lock")
     supports_for_update = True
 
     def __init__(self, connection: asyncpg.Connection) -> None:
@@ -73,22 +82,33 @@ class Connection(ConnectionABC):
         try:
             async with self._lock:
                 return await self._connection.execute(compiled_query, *args)
-        except asyncpg.exceptions.UndefinedParameterError as error:
+        except AsyncpgUndefinedParameterError as error:
             raise UndefinedParameterError(str(error))
 
     async def execute_many(self, query: LiteralString, values: List[ValueType]) -> None:
         if not values:
             return
 
-        compiled_queries = [self._compile(query, value) for value in values]
-        compiled_query = compiled_queries[0][0]
-        args = [query[1] for query in compiled_queries]
+        compiled_query, args = self._compile_many(query, values)
         try:
             async with self._lock:
                 return await self._connection.executemany(compiled_query, args)
-        except asyncpg.exceptions.UndefinedParameterError as error:
+        except AsyncpgUndefinedParameterError as error:
             raise UndefinedParameterError(str(error))
 
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        *,
+        records: Iterable[Sequence[Any]],
+        columns: Optional[Sequence[str]] = None,
+        schema_name: Optional[str] = None,
+    ) -> None:
+        async with self._lock:
+            await self._connection.copy_records_to_table(
+                table_name, records=records, columns=columns, schema_name=schema_name
+            )
+
     async def fetch_all(
         self,
         query: LiteralString,
@@ -98,7 +118,7 @@ class Connection(ConnectionABC):
         try:
             async with self._lock:
                 return await self._connection.fetch(compiled_query, *args)
-        except asyncpg.exceptions.UndefinedParameterError as error:
+        except AsyncpgUndefinedParameterError as error:
             raise UndefinedParameterError(str(error))
 
     async def fetch_one(
@@ -110,7 +130,7 @@ class Connection(ConnectionABC):
         try:
             async with self._lock:
                 return await self._connection.fetchrow(compiled_query, *args)
-        except asyncpg.exceptions.UndefinedParameterError as error:
+        except AsyncpgUndefinedParameterError as error:
             raise UndefinedParameterError(str(error))
 
     async def fetch_val(
@@ -122,7 +142,7 @@ class Connection(ConnectionABC):
         try:
             async with self._lock:
                 return await self._connection.fetchval(compiled_query, *args)
-        except asyncpg.exceptions.UndefinedParameterError as error:
+        except AsyncpgUndefinedParameterError as error:
             raise UndefinedParameterError(str(error))
 
     async def iterate(
@@ -131,37 +151,69 @@ class Connection(ConnectionABC):
         values: Optional[ValueType] = None,
     ) -> AsyncGenerator[RecordType, None]:
         compiled_query, args = self._compile(query, values)
-        async with self._lock:
-            async with self._connection.transaction():
-                try:
-                    async for record in self._connection.cursor(compiled_query, *args):
+        try:
+            if self._connection.is_in_transaction():
+                # Any interleaved usage of the connection is already
+                # part of the caller's transaction, so the lock is only
+                # held whilst creating the cursor and fetching.
+                async with self._lock:
+                    cursor = await self._connection.cursor(compiled_query, *args)
+                while True:
+                    async with self._lock:
+                        records = await cursor.fetch(ITERATE_PREFETCH)
+                    for record in records:
                         yield record
-                except asyncpg.exceptions.UndefinedParameterError as error:
-                    raise UndefinedParameterError(str(error))
+                    if len(records) < ITERATE_PREFETCH:
+                        break
+            else:
+                # The cursor requires a transaction, which must not
+                # include any other usage of the connection, so the lock
+                # is held throughout.
+                async with self._lock:
+                    async with self._connection.transaction():
+                        async for record in self._connection.cursor(
+                            compiled_query, *args, prefetch=ITERATE_PREFETCH
+                        ):
+                            yield record
+        except AsyncpgUndefinedParameterError as error:
+            raise UndefinedParameterError(str(error))
 
     def transaction(self, *, force_rollback: bool = False) -> "Transaction":
         return Transaction(self, force_rollback=force_rollback)
 
     def _compile(
         self, query: LiteralString, values: Optional[ValueType] = None
-    ) -> Tuple[str, List[Any]]:
-        if isinstance(values, dict):
+    ) -> Tuple[str, Sequence[Any]]:
+        if values is None:
+            return query, ()
+        elif isinstance(values, dict):
             try:
-                return render(query, **(values or {}))
+                return render(query, values)
             except BuildError as error:
                 raise UndefinedParameterError(str(error))
-        elif values is not None:
+        else:
             return query, values
+
+    def _compile_many(
+        self, query: LiteralString, values: List[ValueType]
+    ) -> Tuple[str, List[List[Any]]]:
+        if isinstance(values[0], dict):
+            try:
+                return render_many(query, values)  # type: ignore
+            except BuildError as error:
+                raise UndefinedParameterError(str(error))
         else:
-            return query, []
+            return query, values  # type: ignore
 
 
 class Backend(BackendABC):
+    supports_for_update = True
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
         self._pool: Optional[asyncpg.Pool] = None
         self._url = url
         self._options = options
-        self._type_converters = {**DEFAULT_TYPE_CONVERTERS, **type_converters}
+        self._type_converters = merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters)
 
     async def connect(self) -> None:
         if self._pool is None:
@@ -169,8 +221,14 @@ class Backend(BackendABC):
 
     async def disconnect(self, timeout: Optional[int] = None) -> None:
         if self._pool is not None:
-            await asyncio.wait_for(self._pool.close(), timeout)
-        self._pool = None
+            try:
+                await asyncio.wait_for(self._pool.close(), timeout)
+            except asyncio.TimeoutError:
+                # Close the connections that did not close gracefully
+                self._pool.terminate()
+                raise
+            finally:
+                self._pool = None
 
     async def acquire(self) -> Connection:
         connection = await self._pool.acquire()
@@ -181,25 +239,27 @@ class Backend(BackendABC):
 
     async def _acquire_migration_connection(self) -> Connection:
         asyncpg_connection = await asyncpg.connect(dsn=self._url)
-        await _init_connection(asyncpg_connection, DEFAULT_TYPE_CONVERTERS)  # type: ignore
+        await _init_connection(asyncpg_connection, DEFAULT_TYPE_CONVERTERS)
         return Connection(asyncpg_connection)
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
         await connection._connection.close()
 
     async def _init(self, connection: asyncpg.Connection) -> None:
-        await _init_connection(connection, self._type_converters)  # type: ignore
+        await _init_connection(connection, self._type_converters)
 
 
 class TestingBackend(BackendABC):
+    supports_for_update = True
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
         self._url = url
         self._options = options
-        self._type_converters = {**DEFAULT_TYPE_CONVERTERS, **type_converters}
+        self._type_converters = merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters)
 
     async def connect(self) -> None:
         self._connection = Connection(await asyncpg.connect(dsn=self._url, **self._options))
-        await _init_connection(self._connection._connection, self._type_converters)  # type: ignore
+        await _init_connection(self._connection._connection, self._type_converters)
 
     async def disconnect(self, timeout: Optional[int] = None) -> None:
         await asyncio.wait_for(self._connection._connection.close(), timeout)
@@ -212,7 +272,7 @@ class TestingBackend(BackendABC):
 
     async def _acquire_migration_connection(self) -> Connection:
         asyncpg_connection = await asyncpg.connect(dsn=self._url)
-        await _init_connection(asyncpg_connection, DEFAULT_TYPE_CONVERTERS)  # type: ignore
+        await _init_connection(asyncpg_connection, DEFAULT_TYPE_CONVERTERS)
         return Connection(asyncpg_connection)
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
@@ -222,9 +282,20 @@ class TestingBackend(BackendABC):
 async def _init_connection(connection: asyncpg.Connection, type_converters: TypeConverters) -> None:
     for schema, converters in type_converters.items():
         for typename, (encoder, decoder, _) in converters.items():
-            await connection.set_type_codec(
-                typename,
-                encoder=encoder,
-                decoder=decoder,
-                schema=schema,
-            )
+            if (schema, typename, encoder, decoder) == ("pg_catalog", "jsonb", dumps, loads):
+                # The default JSONB converters can use the binary format
+                # avoiding the text conversion on the server.
+                await connection.set_type_codec(
+                    typename,
+                    encoder=dumps_jsonb,
+                    decoder=loads_jsonb,
+                    schema=schema,
+                    format="binary",
+                )
+            else:
+                await connection.set_type_codec(
+                    typename,
+                    encoder=encoder,
+                    decoder=decoder,
+                    schema=schema,
+                )
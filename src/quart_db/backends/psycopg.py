@@ -1,16 +1,31 @@
 import asyncio
-import json
+from functools import lru_cache
 from types import TracebackType
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
-import asyncpg
 import psycopg
-from buildpg import BuildError, render
+from buildpg import BuildError
+from psycopg import sql
 from psycopg.adapt import Dumper, Loader
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
 from psycopg.types import TypeInfo
 from psycopg_pool import AsyncConnectionPool
 
+from ._compile import render, render_many
+from ._converters import merge_type_converters
+from ._json import dumps, loads
 from ..interfaces import (
     BackendABC,
     ConnectionABC,
@@ -26,15 +41,21 @@ try:
 except ImportError:
     from typing_extensions import LiteralString
 
-DEFAULT_TYPE_CONVERTERS = {
+DEFAULT_TYPE_CONVERTERS: TypeConverters = {
     "pg_catalog": {
-        "json": (json.dumps, json.loads, dict),
-        "jsonb": (json.dumps, json.loads, dict),
+        "json": (dumps, loads, dict),
+        "jsonb": (dumps, loads, dict),
     }
 }
 
+# The number of records read per result when iterating, reading
+# multiple records (chunked mode) requires psycopg to support it
+ITERATE_SIZE = 1000 if psycopg.capabilities.has_stream_chunked() else 1
+
 
 class Transaction(TransactionABC):
+    __slots__ = ("_connection", "_force_rollback", "_transaction")
+
     def __init__(self, connection: "Connection", *, force_rollback: bool = False) -> None:
         self._connection = connection
         self._transaction: Optional[psycopg.AsyncTransaction] = None
@@ -52,19 +73,20 @@ class Transaction(TransactionABC):
 
     async def start(self) -> None:
         self._transaction = psycopg.AsyncTransaction(self._connection._connection)
-        await self._connection._connection.wait(self._transaction._enter_gen())
+        await self._transaction.__aenter__()
 
     async def commit(self) -> None:
-        await self._connection._connection.wait(self._transaction._exit_gen(None, None, None))
+        await self._transaction.__aexit__(None, None, None)
         self._transaction = None
 
     async def rollback(self) -> None:
         self._transaction.force_rollback = True
-        await self._connection._connection.wait(self._transaction._exit_gen(None, None, None))
+        await self._transaction.__aexit__(None, None, None)
         self._transaction = None
 
 
 class Connection(ConnectionABC):
+    __slots__ = ("_connection",)
     supports_for_update = True
 
     def __init__(self, connection: psycopg.AsyncConnection) -> None:
@@ -82,15 +104,36 @@ class Connection(ConnectionABC):
         if not values:
             return
 
-        compiled_queries = [self._compile(query, value) for value in values]
-        compiled_query = compiled_queries[0][0]
-        args = [query[1] for query in compiled_queries]
+        compiled_query, args = self._compile_many(query, values)
         try:
             async with self._connection.cursor() as cursor:
                 return await cursor.executemany(compiled_query, args)
         except psycopg.ProgrammingError as error:
             raise UndefinedParameterError(str(error))
 
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        *,
+        records: Iterable[Sequence[Any]],
+        columns: Optional[Sequence[str]] = None,
+        schema_name: Optional[str] = None,
+    ) -> None:
+        if schema_name is None:
+            table = sql.Identifier(table_name)
+        else:
+            table = sql.Identifier(schema_name, table_name)
+        if columns is None:
+            query = sql.SQL("COPY {} FROM STDIN").format(table)
+        else:
+            query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+                table, sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+            )
+        async with self._connection.cursor() as cursor:
+            async with cursor.copy(query) as copy:
+                for record in records:
+                    await copy.write_row(record)
+
     async def fetch_all(
         self,
         query: LiteralString,
@@ -124,11 +167,11 @@ class Connection(ConnectionABC):
     ) -> Optional[Any]:
         compiled_query, args = self._compile(query, values)
         try:
-            async with self._connection.cursor() as cursor:
+            async with self._connection.cursor(row_factory=tuple_row) as cursor:
                 await cursor.execute(compiled_query, args)
                 result = await cursor.fetchone()
                 if result is not None:
-                    return next(iter(result.values()))  # type: ignore
+                    return result[0]
                 else:
                     return None
         except psycopg.ProgrammingError as error:
@@ -142,7 +185,7 @@ class Connection(ConnectionABC):
         compiled_query, args = self._compile(query, values)
         async with self._connection.cursor() as cursor:
             try:
-                async for record in cursor.stream(compiled_query, *args):
+                async for record in cursor.stream(compiled_query, args, size=ITERATE_SIZE):
                     yield record  # type: ignore
             except psycopg.ProgrammingError as error:
                 raise UndefinedParameterError(str(error))
@@ -155,19 +198,42 @@ class Connection(ConnectionABC):
     ) -> Tuple[str, List[Any]]:
         if isinstance(values, list):
             return query, values
+        elif values is None and ":" not in query:
+            return query, []  # No binds to render
         else:
             try:
-                return render(query, **(values or {}))
+                return render(query, values or {})
+            except BuildError as error:
+                raise UndefinedParameterError(str(error))
+
+    def _compile_many(
+        self, query: LiteralString, values: List[ValueType]
+    ) -> Tuple[str, List[List[Any]]]:
+        if isinstance(values[0], dict):
+            try:
+                return render_many(query, values)  # type: ignore
             except BuildError as error:
                 raise UndefinedParameterError(str(error))
+        else:
+            return query, values  # type: ignore
 
 
 class Backend(BackendABC):
+    supports_for_update = True
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
-        self._pool: Optional[asyncpg.Pool] = None
+        self._pool: Optional[AsyncConnectionPool] = None
         self._url = url
-        self._options = options
-        self._type_converters = {**DEFAULT_TYPE_CONVERTERS, **type_converters}
+        self._options = {**options}
+        # This is a connection, rather than pool, option
+        self._prepare_threshold = self._options.pop("prepare_threshold", 5)
+        # The pool's configure is used to initialise the connections,
+        # with any user configure called afterwards
+        self._configure: Optional[Callable[[psycopg.AsyncConnection], Awaitable[None]]] = (
+            self._options.pop("configure", None)
+        )
+        self._type_converters = merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters)
+        self._type_infos: Dict[str, TypeInfo] = {}
 
     async def connect(self) -> None:
         if self._pool is None:
@@ -176,8 +242,10 @@ class Backend(BackendABC):
                 kwargs={
                     "autocommit": True,
                     "cursor_factory": psycopg.AsyncRawCursor,
+                    "prepare_threshold": self._prepare_threshold,
                     "row_factory": dict_row,
                 },
+                configure=self._init,
                 **self._options,
             )
             await self._pool.open()
@@ -189,7 +257,6 @@ class Backend(BackendABC):
 
     async def acquire(self) -> Connection:
         connection = await self._pool.getconn()
-        await _init_connection(connection, self._type_converters)  # type: ignore
         return Connection(connection)
 
     async def release(self, connection: Connection) -> None:  # type: ignore[override]
@@ -199,21 +266,25 @@ class Backend(BackendABC):
         psycopg_connection = await psycopg.AsyncConnection.connect(
             self._url, autocommit=True, cursor_factory=psycopg.AsyncRawCursor, row_factory=dict_row
         )
-        await _init_connection(psycopg_connection, DEFAULT_TYPE_CONVERTERS)  # type: ignore
+        await _init_connection(psycopg_connection, DEFAULT_TYPE_CONVERTERS)
         return Connection(psycopg_connection)
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
         await connection._connection.close()
 
-    async def _init(self, connection: asyncpg.Connection) -> None:
-        await _init_connection(connection, self._type_converters)  # type: ignore
+    async def _init(self, connection: psycopg.AsyncConnection) -> None:
+        await _init_connection(connection, self._type_converters, self._type_infos)
+        if self._configure is not None:
+            await self._configure(connection)
 
 
 class TestingBackend(BackendABC):
+    supports_for_update = True
+
     def __init__(self, url: str, options: Dict[str, Any], type_converters: TypeConverters) -> None:
         self._url = url
         self._options = options
-        self._type_converters = {**DEFAULT_TYPE_CONVERTERS, **type_converters}
+        self._type_converters = merge_type_converters(DEFAULT_TYPE_CONVERTERS, type_converters)
 
     async def connect(self) -> None:
         self._connection = Connection(
@@ -224,7 +295,7 @@ class TestingBackend(BackendABC):
                 row_factory=dict_row,  # type: ignore
             )
         )
-        await _init_connection(self._connection._connection, self._type_converters)  # type: ignore
+        await _init_connection(self._connection._connection, self._type_converters)
 
     async def disconnect(self, timeout: Optional[int] = None) -> None:
         await asyncio.wait_for(self._connection._connection.close(), timeout)
@@ -239,28 +310,49 @@ class TestingBackend(BackendABC):
         psycopg_connection = await psycopg.AsyncConnection.connect(
             self._url, autocommit=True, cursor_factory=psycopg.AsyncRawCursor, row_factory=dict_row
         )
-        await _init_connection(psycopg_connection, DEFAULT_TYPE_CONVERTERS)  # type: ignore
+        await _init_connection(psycopg_connection, DEFAULT_TYPE_CONVERTERS)
         return Connection(psycopg_connection)
 
     async def _release_migration_connection(self, connection: Connection) -> None:  # type: ignore[override]  # noqa: E501
         await connection._connection.close()
 
 
-async def _init_connection(connection: psycopg.Connection, type_converters: TypeConverters) -> None:
+async def _init_connection(
+    connection: psycopg.AsyncConnection,
+    type_converters: TypeConverters,
+    type_infos: Optional[Dict[str, TypeInfo]] = None,
+) -> None:
+    # The type information is fixed for the database, so it can be
+    # fetched once and shared by every connection in a pool.
+    if type_infos is None:
+        type_infos = {}
+
     for schema, converters in type_converters.items():
         for typename, (encoder, decoder, type_) in converters.items():
-            psycopg_type = await TypeInfo.fetch(connection, typename)  # type: ignore
+            psycopg_type = type_infos.get(typename)
+            if psycopg_type is None:
+                psycopg_type = await TypeInfo.fetch(connection, typename)
+                type_infos[typename] = psycopg_type
             psycopg_type.register(connection)
 
-            class CustomLoader(Loader):
-                def load(self, data: bytes, decoder=decoder) -> Any:  # type: ignore
-                    return decoder(data.decode())
+            loader, dumper = _adapter_classes(psycopg_type.oid, encoder, decoder)
+            connection.adapters.register_loader(psycopg_type.oid, loader)
+            connection.adapters.register_dumper(type_, dumper)
+
+
+@lru_cache(maxsize=None)
+def _adapter_classes(
+    type_oid: int, encoder: Callable, decoder: Callable
+) -> Tuple[Type[Loader], Type[Dumper]]:
+    # Created once per converter, rather than per connection
+    class CustomLoader(Loader):
+        def load(self, data: bytes) -> Any:  # type: ignore
+            return decoder(data.decode())
 
-            class CustomDumper(Dumper):
-                oid = psycopg_type.oid
+    class CustomDumper(Dumper):
+        oid = type_oid
 
-                def dump(self, elem: Any, encoder=encoder) -> bytes:  # type: ignore
-                    return encoder(elem).encode()
+        def dump(self, elem: Any) -> bytes:
+            return encoder(elem).encode()
 
-            connection.adapters.register_loader(psycopg_type.oid, CustomLoader)
-            connection.adapters.register_dumper(type_, CustomDumper)
+    return CustomLoader, CustomDumper
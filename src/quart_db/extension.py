@@ -1,14 +1,15 @@
 import asyncio
 from collections import defaultdict
-from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncIterator, Callable, Dict, Optional, Type
+from types import TracebackType
+from typing import Any, Callable, Dict, Optional, Type
 from urllib.parse import urlsplit, urlunsplit
 
 import click
 from quart import g, Quart
 from quart.cli import pass_script_info, ScriptInfo
 
+from ._lazy_connection import LazyConnection
 from ._migration import (
     ensure_state_table,
     execute_background_migrations,
@@ -22,6 +23,22 @@ class MigrationTimeoutError(Exception):
     pass
 
 
+class _ConnectionContext:
+    __slots__ = ("_connection", "_db")
+
+    def __init__(self, db: "QuartDB") -> None:
+        self._db = db
+        self._connection: Optional[ConnectionABC] = None
+
+    async def __aenter__(self) -> ConnectionABC:
+        self._connection = await self._db.acquire()
+        return self._connection
+
+    async def __aexit__(self, exc_type: type, exc_value: BaseException, tb: TracebackType) -> None:
+        await self._db.release(self._connection)
+        self._connection = None
+
+
 class QuartDB:
     """A QuartDB database instance from which connections can be acquired.
 
@@ -69,6 +86,9 @@ class QuartDB:
              backend used.
         state_table_name: The name of the table used to store the
              migration status.
+        migrations_single_transaction: If True the pending foreground
+             migrations are run in a single transaction, rather than a
+             transaction per migration (the default).
     """
 
     def __init__(
@@ -83,12 +103,11 @@ class QuartDB:
         test_connection_options: Optional[Dict[str, Any]] = None,
         migration_timeout: Optional[float] = None,
         state_table_name: Optional[str] = None,
+        migrations_single_transaction: Optional[bool] = None,
     ) -> None:
         self._close_timeout = 5  # Seconds
         self._url = url
         self._backend_options = backend_options
-        if self._backend_options is None:
-            self._backend_options = {}
         self._test_connection_options = test_connection_options
         if self._test_connection_options is None:
             self._test_connection_options = {}
@@ -99,6 +118,7 @@ class QuartDB:
         self._data_path = data_path
         self._auto_request_connection = auto_request_connection
         self._state_table_name = state_table_name
+        self._migrations_single_transaction = migrations_single_transaction
         if app is not None:
             self.init_app(app)
 
@@ -115,7 +135,19 @@ class QuartDB:
             self._migration_timeout = app.config.get("QUART_DB_MIGRATION_TIMEOUT", 60)
         if self._state_table_name is None:
             self._state_table_name = app.config.get("QUART_DB_STATE_TABLE_NAME", "schema_migration")
-        self._root_path = Path(app.root_path)
+        if self._backend_options is None:
+            self._backend_options = app.config.get("QUART_DB_BACKEND_OPTIONS", {})
+        if self._migrations_single_transaction is None:
+            self._migrations_single_transaction = app.config.get(
+                "QUART_DB_MIGRATIONS_SINGLE_TRANSACTION", False
+            )
+        root_path = Path(app.root_path)
+        self._migrations_path: Optional[Path] = None
+        if self._migrations_folder is not None:
+            self._migrations_path = root_path / self._migrations_folder
+        self._data_file_path: Optional[Path] = None
+        if self._data_path is not None:
+            self._data_file_path = root_path / self._data_path
         self._testing = app.testing and app.config.get("QUART_DB_TESTING", None)
 
         if app.config["PROPAGATE_EXCEPTIONS"] is None:
@@ -138,7 +170,7 @@ class QuartDB:
     async def before_serving(self) -> None:
         self._backend = self._create_backend()
 
-        if self._migrations_folder is not None or self._data_path is not None:
+        if self._migrations_path is not None or self._data_file_path is not None:
             try:
                 await asyncio.wait_for(self.migrate(), timeout=self._migration_timeout)
             except asyncio.TimeoutError:
@@ -149,41 +181,48 @@ class QuartDB:
         await self._backend.disconnect(self._close_timeout)
 
     async def before_request(self) -> None:
-        g.connection = await self.acquire()
+        g.connection = LazyConnection(self._backend)
 
     async def teardown_request(self, _exception: Optional[BaseException]) -> None:
         if getattr(g, "connection", None) is not None:
-            await self.release(g.connection)
+            await g.connection.release()
         g.connection = None
 
     async def migrate(self, force_foreground: bool = False) -> None:
-        await ensure_state_table(self._backend, self._state_table_name)
+        # A single connection is used for the foreground work, whereas
+        # the background migrations acquire their own as they may
+        # outlive this call.
+        connection = await self._backend._acquire_migration_connection()
+        try:
+            await ensure_state_table(connection, self._state_table_name)
 
-        if self._migrations_folder is not None:
-            migrations_folder = self._root_path / self._migrations_folder
-            await execute_foreground_migrations(
-                self._backend, migrations_folder, self._state_table_name
-            )
-            if force_foreground:
-                await execute_background_migrations(
-                    self._backend,
-                    migrations_folder,
-                    self._state_table_name,
-                )
-            else:
-                self._app.add_background_task(
-                    execute_background_migrations,
-                    self._backend,
-                    migrations_folder,
+            if self._migrations_path is not None:
+                await execute_foreground_migrations(
+                    connection,
+                    self._migrations_path,
                     self._state_table_name,
+                    self._migrations_single_transaction,
                 )
+                if force_foreground:
+                    await execute_background_migrations(
+                        self._backend,
+                        self._migrations_path,
+                        self._state_table_name,
+                    )
+                else:
+                    self._app.add_background_task(
+                        execute_background_migrations,
+                        self._backend,
+                        self._migrations_path,
+                        self._state_table_name,
+                    )
+
+            if self._data_file_path is not None:
+                await execute_data_loader(connection, self._data_file_path, self._state_table_name)
+        finally:
+            await self._backend._release_migration_connection(connection)
 
-        if self._data_path is not None:
-            data_path = self._root_path / self._data_path
-            await execute_data_loader(self._backend, data_path, self._state_table_name)
-
-    @asynccontextmanager
-    async def connection(self) -> AsyncIterator[ConnectionABC]:
+    def connection(self) -> _ConnectionContext:
         """Acquire a connection to the database.
 
         This should be used in an async with block as so,
@@ -194,11 +233,7 @@ class QuartDB:
                 await connection.execute("SELECT 1")
 
         """
-        conn = await self.acquire()
-        try:
-            yield conn
-        finally:
-            await self.release(conn)
+        return _ConnectionContext(self)
 
     async def acquire(self) -> ConnectionABC:
         """Acquire a connection to the database.
@@ -1,6 +1,19 @@
 from abc import ABC, abstractmethod
 from types import TracebackType
-from typing import Any, AsyncGenerator, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 try:
     from typing import LiteralString
@@ -18,6 +31,8 @@ class UndefinedParameterError(Exception):
 
 
 class TransactionABC(ABC):
+    __slots__ = ()
+
     @abstractmethod
     async def __aenter__(self) -> "TransactionABC":
         pass
@@ -40,6 +55,8 @@ class TransactionABC(ABC):
 
 
 class ConnectionABC(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def supports_for_update(self) -> bool:
@@ -65,6 +82,31 @@ class ConnectionABC(ABC):
         """
         pass
 
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        *,
+        records: Iterable[Sequence[Any]],
+        columns: Optional[Sequence[str]] = None,
+        schema_name: Optional[str] = None,
+    ) -> None:
+        """Copy the records into the table
+
+        For PostgreSQL this uses the COPY protocol and is much faster
+        than :meth:`execute_many` for bulk inserts e.g. of more than a
+        thousand records. For SQLite the records are inserted in a
+        single transaction. Connections that do not override this
+        raise a NotImplementedError.
+
+        Arguments:
+            table_name: The name of the table to copy into.
+            records: The records, each a sequence of column values.
+            columns: The columns the record values are for, defaults
+                to all the columns of the table.
+            schema_name: The schema of the table.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     async def fetch_all(
         self, query: LiteralString, values: Optional[ValueType] = None
@@ -131,6 +173,9 @@ class ConnectionABC(ABC):
 
 
 class BackendABC(ABC):
+    # Whether the backend's connections support SELECT ... FOR UPDATE
+    supports_for_update = False
+
     @abstractmethod
     def __init__(
         self, url: str, options: Optional[Dict[str, Any]], type_converters: TypeConverters
@@ -0,0 +1,21 @@
+from typing import Any, Union
+
+import orjson
+
+
+def dumps(value: Any) -> str:
+    """Encode the value to JSON using orjson.
+
+    This can be used as the JSON encoder via
+    :meth:`~quart_db.QuartDB.set_converter`.
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def loads(value: Union[bytes, str]) -> Any:
+    """Decode the JSON value using orjson.
+
+    This can be used as the JSON decoder via
+    :meth:`~quart_db.QuartDB.set_converter`.
+    """
+    return orjson.loads(value)
@@ -0,0 +1,108 @@
+import asyncio
+from pathlib import Path
+from sqlite3 import IntegrityError
+
+import pytest
+
+from quart_db.backends.aiosqlite import Backend
+
+
+async def test_pool_reuses_connections(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {"pool_size": 1}, {})
+    first = await backend.acquire()
+    second = await backend.acquire()
+    await backend.release(first)
+    await backend.release(second)  # Pool is full, so is closed
+
+    connection = await backend.acquire()
+    assert connection._connection is first._connection
+    assert await connection.fetch_val("SELECT 1") == 1
+
+    await backend.release(connection)
+    await backend.disconnect()
+
+
+async def test_execute_many_rollback(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend.acquire()
+    await connection.execute("CREATE TABLE tbl (value INTEGER UNIQUE)")
+    await connection.execute_many("INSERT INTO tbl (value) VALUES (:value)", [{"value": 1}])
+    with pytest.raises(IntegrityError):
+        await connection.execute_many(
+            "INSERT INTO tbl (value) VALUES (:value)", [{"value": 2}, {"value": 1}]
+        )
+    assert await connection.fetch_val("SELECT COUNT(*) FROM tbl") == 1
+    assert not connection._connection.in_transaction
+
+    await backend.release(connection)
+    await backend.disconnect()
+
+
+async def test_pragmas(tmp_path: Path) -> None:
+    backend = Backend(
+        f"sqlite:////{tmp_path / 'temp.sql'}", {"pragmas": {"synchronous": "FULL"}}, {}
+    )
+    connection = await backend.acquire()
+    assert await connection.fetch_val("PRAGMA journal_mode") == "wal"
+    assert await connection.fetch_val("PRAGMA synchronous") == 2  # FULL
+
+    await backend.release(connection)
+    await backend.disconnect()
+
+
+async def test_rows_are_dicts(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend.acquire()
+    assert await connection.fetch_one("SELECT 1 AS a, 2 AS b") == {"a": 1, "b": 2}
+    assert type(await connection.fetch_one("SELECT 1 AS a")) is dict
+
+    await backend.release(connection)
+    await backend.disconnect()
+
+
+async def test_disconnect_raises_close_errors(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    first = await backend.acquire()
+    second = await backend.acquire()
+
+    async def _fail() -> None:
+        raise ValueError()
+
+    close = first._connection.close
+    first._connection.close = _fail  # type: ignore
+    with pytest.raises(ValueError):
+        await backend.disconnect()
+    assert second._connection._connection is None  # Closed despite the failure
+    await close()
+
+
+async def test_concurrent_execute_many(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend.acquire()
+    await connection.execute("CREATE TABLE tbl (value INTEGER)")
+    query = "INSERT INTO tbl (value) VALUES (:value)"
+    await asyncio.gather(
+        connection.execute_many(query, [{"value": 1}, {"value": 2}]),
+        connection.execute_many(query, [{"value": 3}, {"value": 4}]),
+        connection.execute(query, {"value": 5}),
+    )
+    assert await connection.fetch_val("SELECT COUNT(*) FROM tbl") == 5
+    assert not connection._connection.in_transaction
+
+    await backend.release(connection)
+    await backend.disconnect()
+
+
+async def test_copy_records_to_table_all_columns(tmp_path: Path) -> None:
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend.acquire()
+    await connection.execute('CREATE TABLE "my tbl" (a INTEGER, b TEXT)')
+    await connection.copy_records_to_table("my tbl", records=[(1, "x"), (2, "y")])
+    assert await connection.fetch_all('SELECT a, b FROM "my tbl"') == [
+        {"a": 1, "b": "x"},
+        {"a": 2, "b": "y"},
+    ]
+    assert not connection._connection.in_transaction
+
+    await backend.release(connection)
+    await backend.disconnect()
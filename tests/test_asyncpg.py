@@ -0,0 +1,27 @@
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+from quart_db.backends.asyncpg import Connection
+
+
+async def test_iterate_interleaved() -> None:
+    if "DATABASE_URL" not in os.environ:
+        pytest.skip("Requires a Postgres database")
+
+    connection = Connection(await asyncpg.connect(dsn=os.environ["DATABASE_URL"]))
+    try:
+        await connection.execute("CREATE TEMPORARY TABLE interleaved (value INT)")
+        iterator = connection.iterate("SELECT generate_series(1, 3)")
+        await iterator.__anext__()
+        task = asyncio.ensure_future(
+            connection.execute("INSERT INTO interleaved (value) VALUES (1)")
+        )
+        await asyncio.sleep(0)
+        await iterator.aclose()  # Ending early rolls back the iterate transaction
+        await task
+        assert await connection.fetch_val("SELECT COUNT(*) FROM interleaved") == 1
+    finally:
+        await connection._connection.close()
@@ -35,9 +35,47 @@ async def test_g_connection_release(url: str, exception: Type[Exception]) -> Non
 
     @app.get("/")
     async def index() -> NoReturn:
+        await g.connection.execute("SELECT 1")
         raise exception()
 
     async with app.test_app():
         test_client = app.test_client()
         await test_client.get("/")
-    assert db._backend._connections == set()  # type: ignore
+        # Released back to the pool rather than leaked
+        assert len(db._backend._connections) == 1  # type: ignore
+        assert db._backend._idle == list(db._backend._connections)  # type: ignore
+
+
+async def test_g_connection_lazy(url: str) -> None:
+    if not url.startswith("sqlite"):
+        pytest.skip("aiosqlite - simpler backend to test")
+
+    app = Quart(__name__)
+    db = QuartDB(app, auto_request_connection=True, url=url)
+
+    @app.get("/")
+    async def index() -> ResponseReturnValue:
+        assert db._backend._connections == set()  # type: ignore
+        async with g.connection.transaction():
+            return await g.connection.fetch_val("SELECT 'test'")
+
+    async with app.test_app():
+        test_client = app.test_client()
+        response = await test_client.get("/")
+        assert (await response.get_data(as_text=True)) == "test"
+        assert db._backend._idle != []  # type: ignore
+
+
+async def test_g_connection_supports_for_update(url: str) -> None:
+    app = Quart(__name__)
+    QuartDB(app, auto_request_connection=True, url=url)
+
+    @app.get("/")
+    async def index() -> ResponseReturnValue:
+        return str(g.connection.supports_for_update)  # Before any query
+
+    async with app.test_app():
+        test_client = app.test_client()
+        response = await test_client.get("/")
+        data = await response.get_data(as_text=True)
+    assert data == str(not url.startswith("sqlite"))
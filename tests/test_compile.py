@@ -0,0 +1,41 @@
+import pytest
+from buildpg import BuildError, funcs, render as buildpg_render, V
+
+from quart_db.backends._compile import render, render_many
+
+
+@pytest.mark.parametrize(
+    "query, values",
+    [
+        ("SELECT * FROM tbl WHERE id = :id", {"id": 2}),
+        ("SELECT :b, :a, :b", {"a": 1, "b": 2}),
+        ("SELECT :a::TEXT", {"a": 1}),
+        ("SELECT * FROM tbl WHERE :where", {"where": funcs.AND(V("a") == 1, V("b") == 2)}),
+    ],
+)
+def test_render(query: str, values: dict) -> None:
+    assert render(query, values) == buildpg_render(query, **values)
+
+
+def test_render_cached_arguments() -> None:
+    assert render("SELECT :a, :b", {"a": 1, "b": 2}) == ("SELECT $1, $2", [1, 2])
+    assert render("SELECT :a, :b", {"b": 3, "a": 4}) == ("SELECT $1, $2", [4, 3])
+
+
+def test_render_missing_bind() -> None:
+    with pytest.raises(BuildError) as exc:
+        render("SELECT :a, :b", {"a": 1})
+    assert "b" in str(exc.value)
+
+
+def test_render_many() -> None:
+    assert render_many("SELECT :a, :b", [{"a": 1, "b": 2}, {"b": 3, "a": 4}]) == (
+        "SELECT $1, $2",
+        [[1, 2], [4, 3]],
+    )
+
+
+def test_render_many_missing_bind() -> None:
+    with pytest.raises(BuildError) as exc:
+        render_many("SELECT :a, :b", [{"a": 1, "b": 2}, {"a": 3}])
+    assert "b" in str(exc.value)
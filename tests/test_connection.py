@@ -62,6 +62,19 @@ async def test_iterate(connection: Connection) -> None:
     ]
 
 
+async def test_iterate_values(connection: Connection) -> None:
+    await connection.execute_many(
+        "INSERT INTO tbl (value) VALUES (:value)",
+        [{"value": 2}, {"value": 3}],
+    )
+    assert [3] == [
+        result["value"]
+        async for result in connection.iterate(
+            "SELECT value FROM tbl WHERE value > :value", {"value": 2}
+        )
+    ]
+
+
 async def test_transaction(connection: Connection) -> None:
     async with connection.transaction():
         await connection.execute("SELECT 1")
@@ -82,3 +95,9 @@ async def test_missing_bind(connection: Connection) -> None:
     with pytest.raises(UndefinedParameterError) as exc:
         await connection.execute("SELECT * FROM tbl WHERE id = :id", {"a": 2})
     assert "id" in str(exc.value)
+
+
+async def test_copy_records_to_table(connection: Connection) -> None:
+    await connection.copy_records_to_table("tbl", records=[(2,), (3,)], columns=["value"])
+    results = await connection.fetch_all("SELECT value FROM tbl")
+    assert [2, 3] == [result["value"] for result in results]
@@ -3,7 +3,9 @@ import sqlite3
 import pytest
 
 from quart_db import Connection
+from quart_db.backends._converters import merge_type_converters
 from quart_db.backends.asyncpg import Connection as AsyncPGConnection
+from quart_db.interfaces import TypeConverters
 from .utils import Options
 
 
@@ -31,3 +33,18 @@ async def test_enum_conversion(connection: Connection) -> None:
     )
     options = await connection.fetch_val("SELECT options FROM tbl WHERE id = :id", {"id": id_})
     assert options == options.B
+
+
+def test_merge_type_converters() -> None:
+    defaults: TypeConverters = {"pg_catalog": {"json": (str, str, None)}}
+    overrides: TypeConverters = {
+        "pg_catalog": {"uuid": (str, str, None)},
+        "public": {"x": (int, int, None)},
+    }
+    merged = merge_type_converters(defaults, overrides)
+    assert merged == {
+        "pg_catalog": {"json": (str, str, None), "uuid": (str, str, None)},
+        "public": {"x": (int, int, None)},
+    }
+    overrides["public"]["y"] = (int, int, None)
+    assert "y" not in merged["public"]
@@ -0,0 +1,36 @@
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from quart import Quart
+
+from quart_db import QuartDB
+from quart_db.backends._json import dumps_jsonb, loads_jsonb
+from quart_db.orjson import dumps as orjson_dumps, loads as orjson_loads
+
+
+def test_jsonb_round_trip() -> None:
+    data = {"a": [1, 2], "b": None}
+    encoded = dumps_jsonb(data)
+    assert encoded[:1] == b"\x01"
+    assert loads_jsonb(encoded) == data
+
+
+def test_jsonb_unsupported_version() -> None:
+    with pytest.raises(ValueError):
+        loads_jsonb(b'\x02{"a": 1}')
+
+
+async def test_orjson_converters(tmp_path: Path) -> None:
+    app = Quart(__name__)
+    db = QuartDB(app, url=f"sqlite:////{tmp_path / 'temp.sql'}", migrations_folder=None)
+    db.set_converter("json", orjson_dumps, orjson_loads, pytype=dict)
+    await app.startup()
+    try:
+        async with db.connection() as connection:
+            await connection.execute("CREATE TABLE tbl (data JSON)")
+            id_ = uuid4()  # Not supported by the stdlib json
+            await connection.execute("INSERT INTO tbl (data) VALUES (:data)", {"data": {"a": id_}})
+            assert await connection.fetch_val("SELECT data FROM tbl") == {"a": str(id_)}
+    finally:
+        await app.shutdown()
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from quart_db._migration import (
+    _migration_generator,
+    _migration_numbers,
+    ensure_state_table,
+    execute_foreground_migrations,
+    null_context,
+)
+from quart_db.backends.aiosqlite import Backend
+from quart_db.interfaces import ConnectionABC, ValueType
+
+MIGRATION = """
+cheap = {cheap}
+
+
+async def migrate(connection):
+    await connection.execute("CREATE TABLE tbl_{migration} (id INTEGER)")
+"""
+
+
+class _CountingConnection:
+    def __init__(self, connection: ConnectionABC) -> None:
+        self._connection = connection
+        self.updates = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    async def execute(self, query: str, values: Optional[ValueType] = None) -> None:
+        if query.startswith("UPDATE schema_migration"):
+            self.updates += 1
+        await self._connection.execute(query, values)
+
+
+async def test_cheap_migrations(tmp_path: Path) -> None:
+    migrations_path = tmp_path / "migrations"
+    migrations_path.mkdir()
+    for migration, cheap in enumerate([False, True, True, False, True]):
+        (migrations_path / f"{migration}.py").write_text(
+            MIGRATION.format(cheap=cheap, migration=migration)
+        )
+
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend._acquire_migration_connection()
+    try:
+        await ensure_state_table(connection, "schema_migration")
+        counting_connection = _CountingConnection(connection)
+        await execute_foreground_migrations(
+            counting_connection, migrations_path, "schema_migration"  # type: ignore
+        )
+        # Migrations 1 and 2 are cheap and share a single state update
+        assert counting_connection.updates == 4
+
+        assert await connection.fetch_val("SELECT foreground FROM schema_migration") == 4
+        tables = await connection.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")
+        assert {f"tbl_{migration}" for migration in range(5)} <= {table["name"] for table in tables}
+    finally:
+        await backend._release_migration_connection(connection)
+
+
+@pytest.mark.parametrize("single_transaction", [False, True])
+async def test_failed_migration_rollback(tmp_path: Path, single_transaction: bool) -> None:
+    migrations_path = tmp_path / "migrations"
+    migrations_path.mkdir()
+    (migrations_path / "0.py").write_text(MIGRATION.format(cheap=False, migration=0))
+    (migrations_path / "1.py").write_text(
+        "async def migrate(connection):\n    raise ValueError()\n"
+    )
+
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend._acquire_migration_connection()
+    try:
+        await ensure_state_table(connection, "schema_migration")
+        with pytest.raises(ValueError):
+            await execute_foreground_migrations(
+                connection, migrations_path, "schema_migration", single_transaction
+            )
+
+        # With a single transaction migration 0 is rolled back as well
+        expected = -1 if single_transaction else 0
+        assert await connection.fetch_val("SELECT foreground FROM schema_migration") == expected
+        tables = await connection.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")
+        assert ("tbl_0" in {table["name"] for table in tables}) is not single_transaction
+    finally:
+        await backend._release_migration_connection(connection)
+
+
+def test_migration_numbers(tmp_path: Path) -> None:
+    for name in ["0", "1", "01", "²", "١", "10", "data"]:
+        (tmp_path / f"{name}.py").write_text("")
+    assert _migration_numbers(tmp_path) == {0, 1, 10}
+
+
+async def test_cheap_background_migrations(tmp_path: Path) -> None:
+    migrations_path = tmp_path / "migrations"
+    migrations_path.mkdir()
+    for migration in range(3):
+        (migrations_path / f"{migration}.py").write_text(
+            MIGRATION.format(cheap=True, migration=migration)
+        )
+
+    backend = Backend(f"sqlite:////{tmp_path / 'temp.sql'}", {}, {})
+    connection = await backend._acquire_migration_connection()
+    try:
+        await ensure_state_table(connection, "schema_migration")
+        counting_connection = _CountingConnection(connection)
+        async for _ in _migration_generator(
+            counting_connection,  # type: ignore
+            "background",
+            migrations_path,
+            "schema_migration",
+            null_context,
+        ):
+            pass
+        # Background migrations are not batched, even if cheap
+        assert counting_connection.updates == 3
+    finally:
+        await backend._release_migration_connection(connection)
@@ -0,0 +1,20 @@
+from typing import Any, List
+
+import pytest
+
+from quart_db.backends import psycopg as psycopg_backend
+
+
+async def test_user_configure(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[str] = []
+
+    async def _init_connection(*_: Any) -> None:
+        calls.append("init")
+
+    async def configure(_: Any) -> None:
+        calls.append("configure")
+
+    monkeypatch.setattr(psycopg_backend, "_init_connection", _init_connection)
+    backend = psycopg_backend.Backend("postgresql://localhost/db", {"configure": configure}, {})
+    await backend._init(None)
+    assert calls == ["init", "configure"]